@@ -1,27 +1,99 @@
 # LISE 5.0 - Basic Frontend Web Server (Task 1.5)
 # This script runs a simple web server to launch the orchestrator.
 
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, Response
 import subprocess
 import threading
 import sys
 import os
+import uuid
+import queue
+from collections import deque
 
 # Initialize the Flask application
 app = Flask(__name__)
 
-# --- Global variable to track lab status ---
-lab_status = "Idle"
+class LabState:
+    """
+    Thread-safe holder for a deployment status string.
+    The worker thread writes it while /status handlers read it, so every
+    access goes through a lock instead of relying on a bare module global.
+    """
+    def __init__(self, status="Idle"):
+        self._lock = threading.Lock()
+        self._status = status
+
+    def get(self):
+        with self._lock:
+            return self._status
+
+    def set(self, status):
+        with self._lock:
+            self._status = status
+
+
+# --- Shared state for the overall lab status ---
+lab_state = LabState()
+
+# --- Subscriber queues for the /events Server-Sent Events stream ---
+subscribers = []
+subscribers_lock = threading.Lock()
+
+def subscribe():
+    """
+    Registers a new subscriber queue for status updates.
+    """
+    q = queue.Queue()
+    with subscribers_lock:
+        subscribers.append(q)
+    return q
+
+def unsubscribe(q):
+    """
+    Removes a subscriber queue once its client disconnects.
+    """
+    with subscribers_lock:
+        if q in subscribers:
+            subscribers.remove(q)
+
+def update_lab_status(status):
+    """
+    Updates the shared lab status and pushes it to every SSE subscriber.
+    """
+    lab_state.set(status)
+    with subscribers_lock:
+        for q in subscribers:
+            q.put(status)
+
+# --- Ring buffer of recent orchestrator output lines ---
+# The reader threads append here instead of printing each line, which kept
+# grabbing the stdio lock in the Flask process. Bounded, so a long verbose
+# run cannot grow memory without limit.
+log_buffer = deque(maxlen=2048)
+log_lock = threading.Lock()
+
+def append_log(line):
+    """
+    Appends one orchestrator output line to the ring buffer.
+    """
+    with log_lock:
+        log_buffer.append(line)
+
+# --- Registry of deployment jobs, keyed by job id ---
+# /launch hands out a job id immediately; the frontend (or an API client)
+# can poll /status/<job_id> for that specific deployment.
+jobs = {}
 
-def run_orchestrator_script():
+def run_orchestrator_script(job_id):
     """
     This function runs the orchestrator_vbox.py script in a separate process.
-    It captures and prints the output in real-time.
+    It captures the output into the log ring buffer in real-time (see /logs).
     This function will be run in a background thread to avoid blocking the web server.
     """
-    global lab_status
+    state = jobs[job_id]
     try:
-        lab_status = "Launching..."
+        update_lab_status("Launching...")
+        state.set("Launching...")
         print("--- Starting Orchestrator Script ---")
 
         # Determine the path to the python executable
@@ -31,33 +103,51 @@ def run_orchestrator_script():
         script_dir = os.path.dirname(os.path.abspath(__file__))
         orchestrator_path = os.path.join(script_dir, "orchestrator_vbox.py")
 
-        # Use Popen to run the script as a separate process
+        # Use Popen to run the script as a separate process.
+        # A block buffer instead of line buffering (bufsize=1) means far fewer
+        # read() syscalls while the orchestrator prints its many short status lines.
+        popen_kwargs = {}
+        if sys.version_info >= (3, 10) and hasattr(os, "F_SETPIPE_SZ"):
+            # Enlarge the kernel pipe so a verbose child never stalls on a full pipe.
+            popen_kwargs["pipesize"] = 1024 * 1024
+
         process = subprocess.Popen(
             [python_executable, orchestrator_path],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
-            bufsize=1,
-            universal_newlines=True
+            bufsize=16384,
+            **popen_kwargs
         )
 
-        # Print stdout and stderr line by line in real-time
-        for line in process.stdout:
-            print(line, end='')
-        for line in process.stderr:
-            print(f"ERROR: {line}", end='')
-        
+        # Drain stdout and stderr concurrently. Reading them one after the
+        # other can deadlock: if the child fills the stderr pipe buffer while
+        # we are still blocked on stdout, both processes stall forever.
+        def pump_output(pipe, prefix=''):
+            for line in iter(pipe.readline, ''):
+                append_log(f"{prefix}{line.rstrip()}")
+
+        stdout_reader = threading.Thread(target=pump_output, args=(process.stdout,))
+        stderr_reader = threading.Thread(target=pump_output, args=(process.stderr, "ERROR: "))
+        stdout_reader.start()
+        stderr_reader.start()
+
         process.wait() # Wait for the process to complete
+        stdout_reader.join()
+        stderr_reader.join()
 
         if process.returncode == 0:
-            lab_status = "Successfully Deployed"
+            update_lab_status("Successfully Deployed")
+            state.set("Successfully Deployed")
             print("--- Orchestrator Script Finished Successfully ---")
         else:
-            lab_status = "Error"
+            update_lab_status("Error")
+            state.set("Error")
             print(f"--- Orchestrator Script Exited with Error Code: {process.returncode} ---")
 
     except Exception as e:
-        lab_status = "Error"
+        update_lab_status("Error")
+        state.set("Error")
         print(f"--- An exception occurred while running the orchestrator: {e} ---")
 
 
@@ -76,16 +166,17 @@ def launch_lab():
     This function is triggered when the "Launch Lab" button is clicked.
     It starts the orchestrator script in a new background thread.
     """
-    global lab_status
-    if lab_status == "Launching...":
+    if lab_state.get() == "Launching...":
         return jsonify({"status": "already_running", "message": "Lab deployment is already in progress."}), 409
 
-    # Start the orchestrator script in a new thread
-    thread = threading.Thread(target=run_orchestrator_script)
+    # Register the job and start the orchestrator script in a new thread
+    job_id = str(uuid.uuid4())
+    jobs[job_id] = LabState("Queued")
+    thread = threading.Thread(target=run_orchestrator_script, args=(job_id,))
     thread.daemon = True # Allows the main app to exit even if threads are running
     thread.start()
-    
-    return jsonify({"status": "success", "message": "Lab deployment initiated. See console for progress."})
+
+    return jsonify({"status": "success", "job_id": job_id, "message": "Lab deployment initiated. See console for progress."})
 
 
 @app.route('/status')
@@ -94,11 +185,56 @@ def status():
     This function provides the current status of the lab deployment.
     The frontend can poll this endpoint to update the UI.
     """
-    global lab_status
-    return jsonify({"status": lab_status})
+    return jsonify({"status": lab_state.get()})
+
+
+@app.route('/logs')
+def logs():
+    """
+    Returns the most recent orchestrator output lines from the ring buffer.
+    """
+    with log_lock:
+        return jsonify({"lines": list(log_buffer)})
+
+
+@app.route('/events')
+def events():
+    """
+    Streams lab status updates as Server-Sent Events.
+    The frontend listens here and reacts instantly, so the server does no
+    work between status changes instead of answering a poll every few seconds.
+    """
+    def generate():
+        q = subscribe()
+        try:
+            # Send the current status right away so a new client is in sync.
+            yield f"data: {lab_state.get()}\n\n"
+            while True:
+                yield f"data: {q.get()}\n\n"
+        finally:
+            unsubscribe(q)
+    return Response(generate(), mimetype='text/event-stream')
+
+
+@app.route('/status/<job_id>')
+def job_status(job_id):
+    """
+    This function provides the status of one specific deployment job.
+    """
+    if job_id not in jobs:
+        return jsonify({"status": "unknown", "message": "No such job."}), 404
+    return jsonify({"status": jobs[job_id].get()})
 
 
 if __name__ == '__main__':
     # Run the Flask app
     # host='0.0.0.0' makes it accessible from other devices on your network
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # threaded=True lets /status polls be served concurrently instead of
+    # queueing behind whichever request the single worker is busy with.
+    # Debug mode is opt-in via LISE_DEBUG=1, and the reloader stays off
+    # either way: its restart would silently kill an in-flight deployment
+    # because the orchestrator thread lives in the replaced process.
+    app.run(host='0.0.0.0', port=5000,
+            debug=os.environ.get('LISE_DEBUG') == '1',
+            use_reloader=False,
+            threaded=True)
@@ -0,0 +1 @@
+# LISE 5.0 - Shared package for the lab orchestration engine.
@@ -0,0 +1,259 @@
+# LISE 5.0 - Shared GNS3 orchestration engine
+# One parameterized Orchestrator drives any lab topology against a GNS3
+# server; entry-point scripts (e.g. orchestrator_vbox.py) only declare
+# their node and link specs.
+
+import time
+import json
+import os
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    # Optional: lets us wait on the GNS3 notification stream instead of polling.
+    from websockets.sync.client import connect as ws_connect
+except ImportError:
+    ws_connect = None
+
+# A node to deploy: display name, which GNS3 template it comes from, its
+# canvas position, and whether the orchestrator should start it explicitly
+# (NAT and cloud nodes run on their own).
+NodeSpec = namedtuple('NodeSpec', ['name', 'template_name', 'template_type', 'x', 'y', 'start'],
+                      defaults=[True])
+
+# A cable between two nodes, named ends with port numbers, adapter 0 throughout.
+LinkSpec = namedtuple('LinkSpec', ['node_a', 'port_a', 'node_b', 'port_b'])
+
+
+def delete_project_directory(project_path):
+    """
+    Removes a leftover project directory with the platform's native recursive
+    delete. shutil.rmtree unlinks entry by entry in Python, which crawls on
+    projects holding large VM disk snapshots.
+    """
+    if os.name == 'nt':
+        subprocess.run(['cmd', '/c', 'rmdir', '/s', '/q', project_path])
+    else:
+        subprocess.run(['rm', '-rf', project_path])
+
+
+class Orchestrator:
+    """
+    Deploys one lab scenario on a GNS3 server: cleans up any previous copy of
+    the project, creates the declared nodes and links in parallel, and starts
+    everything concurrently.
+    """
+    def __init__(self, server_url, project_name, nodes, links, boot_delay=20):
+        self.server_url = server_url
+        self.project_name = project_name
+        self.nodes = nodes
+        self.links = links
+        self.boot_delay = boot_delay
+
+        # The pool is sized for the parallel node/link creation phases so
+        # keep-alive connections get reused instead of paying a TCP handshake
+        # per request, and transient GNS3 errors are retried with backoff at
+        # the adapter level. 409 covers GNS3 refusing an action while a
+        # node/project is busy; POST must be listed explicitly because Retry
+        # skips it by default.
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=2,
+                status_forcelist=[409, 502, 503, 504],
+                allowed_methods=["GET", "POST", "DELETE"],
+            ),
+        ))
+        self.session.headers['Content-Type'] = 'application/json'
+
+    def fetch_template_index(self):
+        """
+        Downloads the template list once and indexes it by (name, type).
+        One GET replaces a round trip per template lookup.
+        """
+        response = self.session.get(f"{self.server_url}/v2/templates")
+        response.raise_for_status()
+        return {(t['name'], t['template_type']): t['template_id'] for t in response.json()}
+
+    def wait_for_node_status(self, project_id, node_id, desired_status, timeout=180):
+        """
+        Waits for a specific node to reach a desired status (e.g., 'started').
+        Listens on the GNS3 notification WebSocket when the 'websockets' package
+        is available, and falls back to polling the node endpoint otherwise.
+        """
+        print(f"  - Waiting for node to be '{desired_status}'...")
+        if ws_connect is not None:
+            self._wait_via_notifications(project_id, node_id, desired_status, timeout)
+        else:
+            self._wait_via_polling(project_id, node_id, desired_status, timeout)
+        print(f"    - Node is now '{desired_status}'.")
+
+    def _wait_via_notifications(self, project_id, node_id, desired_status, timeout):
+        """
+        Blocks on the project notification stream until the node reports the
+        desired status. No HTTP polling: GNS3 pushes each state change to us.
+        """
+        ws_url = self.server_url.replace("http", "ws", 1) + f"/v2/projects/{project_id}/notifications/ws"
+        deadline = time.time() + timeout
+        with ws_connect(ws_url) as ws:
+            # Check once after subscribing so a transition cannot slip between
+            # the status read and the start of the event stream.
+            response = self.session.get(f"{self.server_url}/v2/projects/{project_id}/nodes/{node_id}")
+            response.raise_for_status()
+            if response.json()['status'] == desired_status:
+                return
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise Exception(f"Timeout: Node did not reach status '{desired_status}' within {timeout} seconds.")
+                try:
+                    event = json.loads(ws.recv(timeout=remaining))
+                except TimeoutError:
+                    raise Exception(f"Timeout: Node did not reach status '{desired_status}' within {timeout} seconds.")
+                if (event.get('action') == 'node.updated'
+                        and event['event'].get('node_id') == node_id
+                        and event['event'].get('status') == desired_status):
+                    return
+
+    def _wait_via_polling(self, project_id, node_id, desired_status, timeout):
+        """
+        Polls the node endpoint every few seconds until it reports the desired status.
+        """
+        start_time = time.time()
+        while time.time() - start_time < timeout:
+            response = self.session.get(f"{self.server_url}/v2/projects/{project_id}/nodes/{node_id}")
+            response.raise_for_status()
+            if response.json()['status'] == desired_status:
+                return
+            time.sleep(5)
+        raise Exception(f"Timeout: Node did not reach status '{desired_status}' within {timeout} seconds.")
+
+    def deploy(self):
+        """
+        Runs the full scenario deployment from connection check to started lab.
+        """
+        try:
+            # --- Step 1: Verify Connection ---
+            print("Connecting to the GNS3 server...")
+            response = self.session.get(f"{self.server_url}/v2/version")
+            response.raise_for_status()
+            version = response.json()['version']
+            print(f"Connected to GNS3 server version: {version}")
+
+            # --- Step 2: Get Template IDs ---
+            print("\nFetching template information...")
+            templates = self.fetch_template_index()
+            template_ids = {}
+            for spec in self.nodes:
+                key = (spec.template_name, spec.template_type)
+                if key not in templates:
+                    raise ValueError(f"Template '{spec.template_name}' of type '{spec.template_type}' not found.")
+                template_ids[key] = templates[key]
+                print(f"Found Template ID for '{spec.template_name}'")
+
+            # --- Step 3: Robust Clean Up and Create Project ---
+            print(f"\nPreparing project: {self.project_name}...")
+
+            gns3_projects_path = os.path.join(os.path.expanduser("~"), "GNS3", "projects")
+
+            response = self.session.get(f"{self.server_url}/v2/projects")
+            response.raise_for_status()
+            for p in response.json():
+                if p['name'] == self.project_name:
+                    print("Found an old version of the lab. Cleaning it up...")
+                    self.session.post(f"{self.server_url}/v2/projects/{p['project_id']}/close")
+                    time.sleep(1)
+                    self.session.delete(f"{self.server_url}/v2/projects/{p['project_id']}").raise_for_status()
+                    print("API cleanup complete.")
+
+                    project_path = os.path.join(gns3_projects_path, p['project_id'])
+                    if os.path.isdir(project_path):
+                        print(f"Deleting project directory: {project_path}")
+                        delete_project_directory(project_path)
+                        print("Directory deleted.")
+
+                    time.sleep(2)
+                    break
+
+            response = self.session.post(f"{self.server_url}/v2/projects", json={'name': self.project_name})
+            response.raise_for_status()
+            project_data = response.json()
+            project_id = project_data['project_id']
+            print(f"Successfully created project '{project_data['name']}'")
+
+            # --- Step 4: Create Nodes ---
+            print("\nDeploying virtual machines and network devices...")
+
+            def create_node(spec):
+                url = f"{self.server_url}/v2/projects/{project_id}/templates/{template_ids[(spec.template_name, spec.template_type)]}"
+                payload = {'name': spec.name, 'x': spec.x, 'y': spec.y, 'compute_id': 'local'}
+                self.session.post(url, json=payload).raise_for_status()
+
+            # The nodes are independent, so create them in parallel instead
+            # of paying one GNS3 round trip after another.
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                futures = [executor.submit(create_node, spec) for spec in self.nodes]
+                for future in futures:
+                    future.result()
+
+            print("Nodes deployed successfully.")
+            time.sleep(10)
+
+            # --- Step 5: Create Links ---
+            print("\nConnecting the devices with virtual cables...")
+
+            response = self.session.get(f"{self.server_url}/v2/projects/{project_id}/nodes")
+            response.raise_for_status()
+            node_ids_by_name = {n['name']: n['node_id'] for n in response.json()}
+
+            def create_link(link):
+                payload = { "nodes": [
+                    {"adapter_number": 0, "node_id": node_ids_by_name[link.node_a], "port_number": link.port_a},
+                    {"adapter_number": 0, "node_id": node_ids_by_name[link.node_b], "port_number": link.port_b},
+                ] }
+                self.session.post(f"{self.server_url}/v2/projects/{project_id}/links", json=payload).raise_for_status()
+
+            # Like node creation, the links are independent of each other.
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(create_link, self.links))
+
+            print("Nodes linked successfully.")
+
+            # --- Step 6: Start the Lab ---
+            # The nodes have no boot-order dependency, so fire every start
+            # request at once and wait for all of them. Wall time becomes the
+            # slowest boot instead of the sum.
+            print("\nStarting all lab nodes concurrently...")
+
+            def start_node(node_id):
+                self.session.post(f"{self.server_url}/v2/projects/{project_id}/nodes/{node_id}/start").raise_for_status()
+                self.wait_for_node_status(project_id, node_id, 'started')
+
+            start_ids = [node_ids_by_name[spec.name] for spec in self.nodes if spec.start]
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(start_node, start_ids))
+
+            print(f"  - All nodes report 'started'. Pausing for {self.boot_delay} seconds for the VMs to boot and get IPs...")
+            time.sleep(self.boot_delay)
+
+            print("\nLab successfully deployed and all nodes started! You can now see it in GNS3.")
+
+        except requests.exceptions.RequestException as e:
+            print(f"\n--- A Connection Error Occurred ---")
+            if hasattr(e, 'response') and e.response:
+                print(f"Status Code: {e.response.status_code}")
+                print(f"Response: {e.response.text}")
+            else:
+                print(f"Error: {e}")
+
+        except Exception as e:
+            print(f"\n--- An Unexpected Error Occurred ---")
+            print(f"Error: {e}")